@@ -50,11 +50,10 @@ class RAGSystem:
                 file_path
             )
 
-            # Add course metadata to vector store for semantic search
-            self.vector_store.add_course_metadata(course)
-
-            # Add course content chunks to vector store
-            self.vector_store.add_course_content(course_chunks)
+            # Add course metadata and content chunks to the vector store
+            if not self.vector_store.add_course(course, course_chunks):
+                print(f"Course already exists: {course.title} - skipping")
+                return course, 0
 
             return course, len(course_chunks)
         except Exception as e:
@@ -102,10 +101,12 @@ class RAGSystem:
                         self.document_processor.process_course_document(file_path)
                     )
 
-                    if course and course.title not in existing_course_titles:
-                        # This is a new course - add it to the vector store
-                        self.vector_store.add_course_metadata(course)
-                        self.vector_store.add_course_content(course_chunks)
+                    if (
+                        course
+                        and course.title not in existing_course_titles
+                        and self.vector_store.add_course(course, course_chunks)
+                    ):
+                        # This is a new course - it was added to the vector store
                         total_courses += 1
                         total_chunks += len(course_chunks)
                         print(
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from functools import cached_property
 from typing import Any, Dict, Optional, Protocol
 
 from vector_store import SearchResults, VectorStore
@@ -27,6 +28,11 @@ class CourseSearchTool(Tool):
 
     def get_tool_definition(self) -> Dict[str, Any]:
         """Return Anthropic tool definition for this tool"""
+        return self.tool_definition
+
+    @cached_property
+    def tool_definition(self) -> Dict[str, Any]:
+        """Static tool definition, built once per instance"""
         return {
             "name": "search_course_content",
             "description": "Search course materials with smart course name matching and lesson filtering",
@@ -136,6 +142,11 @@ class CourseOutlineTool(Tool):
 
     def get_tool_definition(self) -> Dict[str, Any]:
         """Return Anthropic tool definition for this tool"""
+        return self.tool_definition
+
+    @cached_property
+    def tool_definition(self) -> Dict[str, Any]:
+        """Static tool definition, built once per instance"""
         return {
             "name": "get_course_outline",
             "description": "Get the complete outline of a course including title, link, and all lessons with their titles and links",
@@ -228,6 +239,7 @@ class ToolManager:
 
     def __init__(self):
         self.tools = {}
+        self._definitions_cache = None  # Rebuilt after each registration
 
     def register_tool(self, tool: Tool):
         """Register any tool that implements the Tool interface"""
@@ -236,10 +248,15 @@ class ToolManager:
         if not tool_name:
             raise ValueError("Tool must have a 'name' in its definition")
         self.tools[tool_name] = tool
+        self._definitions_cache = None
 
     def get_tool_definitions(self) -> list:
         """Get all tool definitions for Anthropic tool calling"""
-        return [tool.get_tool_definition() for tool in self.tools.values()]
+        if self._definitions_cache is None:
+            self._definitions_cache = [
+                tool.get_tool_definition() for tool in self.tools.values()
+            ]
+        return self._definitions_cache
 
     def execute_tool(self, tool_name: str, **kwargs) -> str:
         """Execute a tool by name with given parameters"""
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 
 @dataclass
@@ -60,6 +60,16 @@ class SessionManager:
 
         return "\n".join(formatted_messages)
 
+    def get_exchanges(self, session_id: Optional[str]) -> List[Tuple[str, str]]:
+        """Get (user, assistant) message pairs for a session, oldest first"""
+        messages = self.sessions.get(session_id, [])
+
+        return [
+            (question.content, answer.content)
+            for question, answer in zip(messages[::2], messages[1::2])
+            if question.role == "user" and answer.role == "assistant"
+        ]
+
     def clear_session(self, session_id: str):
         """Clear all messages from a session"""
         if session_id in self.sessions:
@@ -2,18 +2,24 @@ import os
 import shutil
 import sys
 import tempfile
+from types import SimpleNamespace
 from typing import Any, Dict, List
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, create_autospec, patch
 
 import pytest
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
+# Importing the backend modules here (conftest loads once per session, and
+# once per xdist worker) puts them and their heavy dependencies - chromadb,
+# anthropic, sentence_transformers - in sys.modules before any test patches
+# "rag_system.*", so no test pays the cold-import cost.
 from ai_generator import AIGenerator
 from config import Config
+from document_processor import DocumentProcessor
 from models import Course, CourseChunk, Lesson
 from rag_system import RAGSystem
-from search_tools import CourseSearchTool, ToolManager
+from search_tools import CourseOutlineTool, CourseSearchTool, ToolManager
 from session_manager import SessionManager
 from vector_store import SearchResults, VectorStore
 
@@ -30,11 +36,14 @@ def temp_dir():
     shutil.rmtree(temp_dir)
 
 
-@pytest.fixture
-def test_config(temp_dir):
-    """Create test configuration"""
+@pytest.fixture(scope="session")
+def test_config(tmp_path_factory):
+    """
+    Create test configuration shared by the whole session.
+    Tests must not mutate it; use dataclasses.replace() for a variant.
+    """
     config = Config()
-    config.CHROMA_PATH = os.path.join(temp_dir, "test_chroma_db")
+    config.CHROMA_PATH = str(tmp_path_factory.mktemp("test_chroma_db"))
     config.ANTHROPIC_API_KEY = "test_api_key"
     config.MAX_RESULTS = 3
     config.CHUNK_SIZE = 200
@@ -42,9 +51,12 @@ def test_config(temp_dir):
     return config
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_course():
-    """Create a sample course for testing"""
+    """
+    Create a sample course for testing.
+    Shared across a module, so tests must not mutate it; use model_copy() instead.
+    """
     lessons = [
         Lesson(
             lesson_number=1,
@@ -66,9 +78,9 @@ def sample_course():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_course_chunks(sample_course):
-    """Create sample course chunks for testing"""
+    """Create sample course chunks for testing (module-scoped, do not mutate)"""
     return [
         CourseChunk(
             content="This is lesson 1 content about introduction to the topic.",
@@ -111,17 +123,33 @@ def mock_vector_store():
 
 
 @pytest.fixture
-def real_vector_store(test_config):
+def real_vector_store(test_config, tmp_path):
     """Create a real vector store for integration tests"""
-    store = VectorStore(
-        chroma_path=test_config.CHROMA_PATH,
+    # Each store gets its own directory: Chroma caches clients per path, so
+    # deleting and reopening a shared path between tests is not safe. The
+    # embedding model itself is loaded once per process: Chroma's
+    # SentenceTransformerEmbeddingFunction keeps a class-level cache by name
+    return VectorStore(
+        chroma_path=str(tmp_path / "test_chroma_db"),
         embedding_model=test_config.EMBEDDING_MODEL,
         max_results=test_config.MAX_RESULTS,
     )
-    yield store
-    # Cleanup
-    if os.path.exists(test_config.CHROMA_PATH):
-        shutil.rmtree(test_config.CHROMA_PATH)
+
+
+@pytest.fixture(scope="session")
+def shared_rag(test_config):
+    """
+    Create one real RAGSystem for the whole session.
+    The embedding model and Chroma client are loaded once instead of per test.
+    """
+    return RAGSystem(test_config)
+
+
+@pytest.fixture
+def real_rag(shared_rag):
+    """Provide the shared real RAGSystem with an empty vector store"""
+    shared_rag.vector_store.clear_all_data()
+    return shared_rag
 
 
 @pytest.fixture
@@ -179,6 +207,12 @@ def search_tool(mock_vector_store):
     return CourseSearchTool(mock_vector_store)
 
 
+@pytest.fixture
+def outline_tool(mock_vector_store):
+    """Create a CourseOutlineTool with mock vector store"""
+    return CourseOutlineTool(mock_vector_store)
+
+
 @pytest.fixture
 def tool_manager(search_tool):
     """Create a ToolManager with registered search tool"""
@@ -212,6 +246,24 @@ def rag_system(test_config):
         return RAGSystem(test_config)
 
 
+@pytest.fixture
+def rag_mocks(monkeypatch):
+    """Patch every RAGSystem collaborator at once, exposing the mocks by name"""
+    mocks = {}
+    for name, spec in (
+        ("DocumentProcessor", DocumentProcessor),
+        ("VectorStore", VectorStore),
+        ("AIGenerator", AIGenerator),
+        ("SessionManager", SessionManager),
+        ("CourseSearchTool", CourseSearchTool),
+    ):
+        mocks[name] = MagicMock()
+        # Spec the instances so a misspelt method name fails instead of passing
+        mocks[name].return_value = create_autospec(spec, instance=True, spec_set=True)
+        monkeypatch.setattr(f"rag_system.{name}", mocks[name])
+    return SimpleNamespace(**mocks)
+
+
 # Test data helpers
 def create_search_results(
     documents: List[str],
@@ -466,6 +518,16 @@ def sample_course_file(temp_dir, sample_course_document):
 
 # ==================== Pytest Markers and Hooks ====================
 
+def pytest_addoption(parser):
+    """Add the opt-in flag for tests that call the live Anthropic API"""
+    parser.addoption(
+        "--run-live-api",
+        action="store_true",
+        default=False,
+        help="run tests marked requires_api against the real Anthropic API",
+    )
+
+
 def pytest_configure(config):
     """Configure custom pytest markers"""
     config.addinivalue_line(
@@ -483,3 +545,18 @@ def pytest_configure(config):
     config.addinivalue_line(
         "markers", "requires_api_key: mark test as requiring external API keys"
     )
+    config.addinivalue_line(
+        "markers", "requires_api: mark test as calling the live Anthropic API"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip live Anthropic API tests unless --run-live-api is given"""
+    if config.getoption("--run-live-api"):
+        return
+
+    # A configured key is not enough: these cost tokens and network round trips
+    skip_live = pytest.mark.skip(reason="needs --run-live-api")
+    for item in items:
+        if "requires_api" in item.keywords:
+            item.add_marker(skip_live)
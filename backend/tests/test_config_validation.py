@@ -11,28 +11,6 @@ from config import Config
 class TestConfigValidation:
     """Test that configuration values are valid"""
 
-    def test_max_results_not_zero(self):
-        """
-        CRITICAL: MAX_RESULTS must be greater than 0
-        If this fails, all searches will return 0 results!
-        """
-        assert Config.MAX_RESULTS > 0, (
-            f"MAX_RESULTS is {Config.MAX_RESULTS}. "
-            "This will cause all vector searches to return 0 results! "
-            "Fix: Change MAX_RESULTS to at least 5 in backend/config.py:21"
-        )
-
-    def test_max_results_reasonable_range(self):
-        """Test that MAX_RESULTS is in a reasonable range"""
-        assert Config.MAX_RESULTS >= 3, (
-            f"MAX_RESULTS={Config.MAX_RESULTS} is too low. "
-            "Recommended: 5-10 for good search quality"
-        )
-        assert Config.MAX_RESULTS <= 50, (
-            f"MAX_RESULTS={Config.MAX_RESULTS} is extremely high. "
-            "This may cause token limit issues. Recommended: 5-10"
-        )
-
     def test_chunk_size_positive(self):
         """Test that CHUNK_SIZE is positive"""
         assert (
@@ -300,3 +278,27 @@ Est. Context Size: ~{Config.CHUNK_SIZE * Config.MAX_RESULTS} chars
 
         # Always pass - this is just informational
         assert True
+
+
+@pytest.mark.integration
+class TestConfigSearchLimits:
+    """MAX_RESULTS checks that guard CourseSearchTool against empty searches"""
+
+    def test_max_results_in_range(self):
+        """
+        CRITICAL TEST: MAX_RESULTS must be positive and in a sensible range
+        This test should FAIL if MAX_RESULTS=0 in config.py
+        """
+        assert Config.MAX_RESULTS > 0, (
+            f"MAX_RESULTS is set to {Config.MAX_RESULTS}. "
+            "This will cause all searches to return 0 results! "
+            "Change to at least 5 in backend/config.py"
+        )
+        assert Config.MAX_RESULTS >= 3, (
+            f"MAX_RESULTS={Config.MAX_RESULTS} is too low. "
+            "Recommended: 5-10 for good search quality"
+        )
+        assert Config.MAX_RESULTS <= 20, (
+            f"MAX_RESULTS={Config.MAX_RESULTS} is very high. "
+            "This may cause token limit issues. Recommended: 5-10"
+        )
@@ -3,293 +3,218 @@ End-to-end tests for RAG system handling content-related queries
 Tests the complete flow from user query to AI response with search
 """
 
-from unittest.mock import MagicMock, Mock, patch
+from dataclasses import replace
+from unittest.mock import DEFAULT, Mock, patch
 
+import anthropic
+import httpx
 import pytest
+import rag_system
 from config import Config
+from document_processor import DocumentProcessor
 from rag_system import RAGSystem
-from vector_store import SearchResults
+from session_manager import SessionManager
+from vector_store import SearchResults, VectorStore
+
+# Shared search payloads; RAGSystem only reads these, so tests can reuse them
+_EMPTY_RESULTS = SearchResults(documents=[], metadata=[], distances=[], error=None)
+_SINGLE_RESULT = SearchResults(
+    documents=["Content"],
+    metadata=[{"course_title": "Course", "lesson_number": 1}],
+    distances=[0.5],
+    error=None,
+)
+
+
+# RAGSystem.query takes its answer and sources straight from the AI generator
+# (tool searches run inside it), so each case is just what generate_response returns
+# (id, AI response, expected source count, source substring)
+_QUERY_CASES = [
+    (
+        "valid_results",
+        (
+            "MCP servers are tools that connect to Claude and provide additional capabilities.",
+            [
+                {
+                    "text": "Introduction to MCP - Lesson 1",
+                    "link": "https://example.com/lesson1",
+                }
+            ],
+        ),
+        1,
+        "Introduction to MCP - Lesson 1",
+    ),
+    ("no_results", ("No relevant content found for your query.", []), 0, None),
+    (
+        "search_error",
+        ("I encountered an error searching the course materials.", []),
+        0,
+        None,
+    ),
+    (
+        "course_filter",
+        (
+            "Information from Advanced MCP course",
+            [{"text": "Advanced MCP - Lesson 3", "link": None}],
+        ),
+        1,
+        "Advanced MCP",
+    ),
+    (
+        "broad_general_query",
+        (
+            "Comprehensive answer based on multiple sources",
+            [
+                {"text": "Course A - Lesson 1", "link": None},
+                {"text": "Course A - Lesson 2", "link": None},
+                {"text": "Course B - Lesson 1", "link": None},
+            ],
+        ),
+        3,
+        None,
+    ),
+    (
+        "specific_lesson_query",
+        (
+            "Information from Lesson 3",
+            [{"text": "MCP Course - Lesson 3", "link": None}],
+        ),
+        1,
+        "Lesson 3",
+    ),
+    (
+        "how_to_query",
+        (
+            "To create a server, follow these steps: ...",
+            [{"text": "MCP Tutorial - Lesson 2", "link": None}],
+        ),
+        1,
+        None,
+    ),
+]
+
+
+@pytest.fixture
+def rag(rag_mocks, test_config):
+    """
+    RAGSystem wired to conftest's rag_mocks, except that SessionManager stays
+    real: it only keeps in-memory messages, and these tests check the history.
+    """
+    rag_mocks.SessionManager.side_effect = SessionManager
+    return RAGSystem(test_config)
 
 
 @pytest.mark.integration
 class TestRAGSystemContentQueries:
     """Test RAG system's handling of content-related questions"""
 
-    def test_content_query_with_valid_results(self, mock_anthropic_client, test_config):
-        """Test successful content query flow with search results"""
-        with (
-            patch("rag_system.VectorStore") as MockVectorStore,
-            patch("rag_system.DocumentProcessor") as MockDocProcessor,
-            patch("rag_system.AIGenerator") as MockAIGenerator,
-        ):
-
-            # Setup mocks
-            mock_store = Mock()
-            mock_processor = Mock()
-            mock_ai = Mock()
-
-            MockVectorStore.return_value = mock_store
-            MockDocProcessor.return_value = mock_processor
-            MockAIGenerator.return_value = mock_ai
-
-            # Mock search results
-            search_results = SearchResults(
-                documents=["MCP servers are tools that connect to Claude"],
-                metadata=[{"course_title": "Introduction to MCP", "lesson_number": 1}],
-                distances=[0.3],
-                error=None,
-            )
-            mock_store.search.return_value = search_results
-            mock_store.get_lesson_link.return_value = "https://example.com/lesson1"
-
-            # Mock AI response
-            mock_ai.generate_response.return_value = (
-                "MCP servers are tools that connect to Claude and provide additional capabilities.",
-                [
-                    {
-                        "text": "Introduction to MCP - Lesson 1",
-                        "link": "https://example.com/lesson1",
-                    }
-                ],
-            )
-
-            # Create RAG system
-            rag = RAGSystem(api_key="test-key", docs_dir="./docs")
-
-            # Execute query
-            response, sources = rag.query("What are MCP servers?", "session_1")
-
-            # Verify
-            assert response is not None
-            assert "MCP servers" in response
-            assert len(sources) == 1
-            assert sources[0]["text"] == "Introduction to MCP - Lesson 1"
-            mock_ai.generate_response.assert_called_once()
-
-    def test_content_query_with_no_results(self, mock_anthropic_client, test_config):
-        """Test content query when search returns no results"""
-        with (
-            patch("rag_system.VectorStore") as MockVectorStore,
-            patch("rag_system.DocumentProcessor") as MockDocProcessor,
-            patch("rag_system.AIGenerator") as MockAIGenerator,
-        ):
-
-            mock_store = Mock()
-            mock_processor = Mock()
-            mock_ai = Mock()
-
-            MockVectorStore.return_value = mock_store
-            MockDocProcessor.return_value = mock_processor
-            MockAIGenerator.return_value = mock_ai
-
-            # Mock empty search results
-            empty_results = SearchResults(
-                documents=[], metadata=[], distances=[], error=None
-            )
-            mock_store.search.return_value = empty_results
-
-            # Mock AI response acknowledging no results
-            mock_ai.generate_response.return_value = (
-                "No relevant content found for your query.",
-                [],
-            )
-
-            rag = RAGSystem(api_key="test-key", docs_dir="./docs")
-            response, sources = rag.query("nonexistent topic", "session_1")
-
-            # Should still get a response, but no sources
-            assert response is not None
-            assert sources == []
-
-    def test_content_query_with_search_error(self, mock_anthropic_client, test_config):
-        """Test content query when search encounters an error"""
-        with (
-            patch("rag_system.VectorStore") as MockVectorStore,
-            patch("rag_system.DocumentProcessor") as MockDocProcessor,
-            patch("rag_system.AIGenerator") as MockAIGenerator,
-        ):
-
-            mock_store = Mock()
-            mock_processor = Mock()
-            mock_ai = Mock()
-
-            MockVectorStore.return_value = mock_store
-            MockDocProcessor.return_value = mock_processor
-            MockAIGenerator.return_value = mock_ai
-
-            # Mock search error
-            error_results = SearchResults(
-                documents=[],
-                metadata=[],
-                distances=[],
-                error="ChromaDB connection failed",
-            )
-            mock_store.search.return_value = error_results
-
-            # Mock AI response handling the error
-            mock_ai.generate_response.return_value = (
-                "I encountered an error searching the course materials.",
-                [],
-            )
-
-            rag = RAGSystem(api_key="test-key", docs_dir="./docs")
-            response, sources = rag.query("test query", "session_1")
-
-            # Should get error-aware response
-            assert response is not None
-            assert sources == []
-
-    def test_content_query_with_course_filter(self, mock_anthropic_client, test_config):
-        """Test content query with course name filtering"""
-        with (
-            patch("rag_system.VectorStore") as MockVectorStore,
-            patch("rag_system.DocumentProcessor") as MockDocProcessor,
-            patch("rag_system.AIGenerator") as MockAIGenerator,
-        ):
-
-            mock_store = Mock()
-            mock_processor = Mock()
-            mock_ai = Mock()
-
-            MockVectorStore.return_value = mock_store
-            MockDocProcessor.return_value = mock_processor
-            MockAIGenerator.return_value = mock_ai
-
-            # Mock filtered search results
-            search_results = SearchResults(
-                documents=["Specific course content"],
-                metadata=[{"course_title": "Advanced MCP", "lesson_number": 3}],
-                distances=[0.2],
-                error=None,
-            )
-            mock_store.search.return_value = search_results
-            mock_store.get_lesson_link.return_value = None
-
-            mock_ai.generate_response.return_value = (
-                "Information from Advanced MCP course",
-                [{"text": "Advanced MCP - Lesson 3", "link": None}],
-            )
-
-            rag = RAGSystem(api_key="test-key", docs_dir="./docs")
-            response, sources = rag.query("specific topic", "session_1")
-
-            assert response is not None
-            assert len(sources) == 1
-            assert "Advanced MCP" in sources[0]["text"]
-
-    def test_content_query_preserves_conversation_history(
-        self, mock_anthropic_client, test_config
+    @pytest.mark.parametrize(
+        "ai_response,expected_sources,expected_substr",
+        [case[1:] for case in _QUERY_CASES],
+        ids=[case[0] for case in _QUERY_CASES],
+    )
+    def test_query_flow(
+        self,
+        rag,
+        ai_response,
+        expected_sources,
+        expected_substr,
     ):
+        """Test the query flow across search outcomes and question types"""
+        rag.ai_generator.generate_response.return_value = ai_response
+
+        response, sources = rag.query("What are MCP servers?", "session_1")
+
+        assert response == ai_response[0]
+        assert len(sources) == expected_sources
+        if expected_substr:
+            assert expected_substr in sources[0]["text"]
+        # Searching is left to the generator, which must get the search tools
+        rag.ai_generator.generate_response.assert_called_once()
+        kwargs = rag.ai_generator.generate_response.call_args.kwargs
+        assert kwargs["tools"] == rag.tool_manager.get_tool_definitions()
+        assert kwargs["tool_manager"] is rag.tool_manager
+
+    def test_content_query_preserves_conversation_history(self, rag):
         """Test that conversation history is maintained across queries"""
-        with (
-            patch("rag_system.VectorStore") as MockVectorStore,
-            patch("rag_system.DocumentProcessor") as MockDocProcessor,
-            patch("rag_system.AIGenerator") as MockAIGenerator,
-        ):
-
-            mock_store = Mock()
-            mock_processor = Mock()
-            mock_ai = Mock()
-
-            MockVectorStore.return_value = mock_store
-            MockDocProcessor.return_value = mock_processor
-            MockAIGenerator.return_value = mock_ai
-
-            mock_store.search.return_value = SearchResults(
-                documents=["Content"],
-                metadata=[{"course_title": "Course", "lesson_number": 1}],
-                distances=[0.5],
-                error=None,
-            )
+        rag.vector_store.search.return_value = _SINGLE_RESULT
 
-            # First query
-            mock_ai.generate_response.return_value = ("First response", [])
-            rag = RAGSystem(api_key="test-key", docs_dir="./docs")
-            rag.query("First question", "session_1")
+        # Record (args, kwargs) as plain tuples rather than inspecting _Call objects
+        calls = []
+        replies = iter([("First response", []), ("Second response", [])])
 
-            # Second query - should include history
-            mock_ai.generate_response.return_value = ("Second response", [])
-            rag.query("Follow-up question", "session_1")
+        def record_call(*args, **kwargs):
+            calls.append((args, kwargs))
+            return next(replies)
 
-            # Verify AI was called with conversation history on second call
-            calls = mock_ai.generate_response.call_args_list
-            assert len(calls) == 2
+        rag.ai_generator.generate_response.side_effect = record_call
 
-            # Second call should have conversation_history parameter
-            second_call_kwargs = calls[1][1]
-            assert "conversation_history" in second_call_kwargs
-            assert second_call_kwargs["conversation_history"] is not None
+        # First query
+        rag.query("First question", "session_1")
 
-    def test_multiple_sessions_isolated(self, mock_anthropic_client, test_config):
-        """Test that different sessions maintain separate conversation histories"""
-        with (
-            patch("rag_system.VectorStore") as MockVectorStore,
-            patch("rag_system.DocumentProcessor") as MockDocProcessor,
-            patch("rag_system.AIGenerator") as MockAIGenerator,
-        ):
-
-            mock_store = Mock()
-            mock_processor = Mock()
-            mock_ai = Mock()
-
-            MockVectorStore.return_value = mock_store
-            MockDocProcessor.return_value = mock_processor
-            MockAIGenerator.return_value = mock_ai
-
-            mock_store.search.return_value = SearchResults(
-                documents=["Content"],
-                metadata=[{"course_title": "Course", "lesson_number": 1}],
-                distances=[0.5],
-                error=None,
-            )
+        # Second query - should include history
+        rag.query("Follow-up question", "session_1")
 
-            mock_ai.generate_response.return_value = ("Response", [])
+        # Verify AI was called with conversation history on second call
+        assert len(calls) == 2
 
-            rag = RAGSystem(api_key="test-key", docs_dir="./docs")
+        # Second call should have conversation_history parameter
+        second_call_kwargs = calls[1][1]
+        assert "conversation_history" in second_call_kwargs
+        assert second_call_kwargs["conversation_history"] is not None
 
-            # Query in session 1
-            rag.query("Session 1 question", "session_1")
+    def test_multiple_sessions_isolated(self, rag):
+        """Test that different sessions maintain separate conversation histories"""
+        # rag.session_manager is deliberately the real SessionManager: it only
+        # keeps a dict of in-memory messages, so there is no I/O to stub out
+        rag.vector_store.search.return_value = _SINGLE_RESULT
+        rag.ai_generator.generate_response.return_value = ("Response", [])
 
-            # Query in session 2 (should have no history)
-            rag.query("Session 2 question", "session_2")
+        # Query in session 1
+        rag.query("Session 1 question", "session_1")
 
-            # Verify sessions are isolated
-            session1_history = rag.session_manager.get_history("session_1")
-            session2_history = rag.session_manager.get_history("session_2")
+        # Query in session 2 (should have no history)
+        rag.query("Session 2 question", "session_2")
 
-            assert "Session 1 question" in session1_history
-            assert "Session 2 question" not in session1_history
-            assert "Session 2 question" in session2_history
-            assert "Session 1 question" not in session2_history
+        # Verify sessions are isolated
+        session1_history = rag.session_manager.get_conversation_history("session_1")
+        session2_history = rag.session_manager.get_conversation_history("session_2")
+
+        assert "Session 1 question" in session1_history
+        assert "Session 2 question" not in session1_history
+        assert "Session 2 question" in session2_history
+        assert "Session 1 question" not in session2_history
 
 
 @pytest.mark.unit
 class TestRAGSystemErrorHandling:
     """Test RAG system's error handling for various failure scenarios"""
 
-    def test_missing_api_key_error(self, test_config):
+    def test_missing_api_key_error(self, mock_anthropic_client, test_config):
         """Test that missing API key is handled gracefully"""
-        with (
-            patch("rag_system.VectorStore") as MockVectorStore,
-            patch("rag_system.DocumentProcessor") as MockDocProcessor,
-        ):
-
-            mock_store = Mock()
-            mock_processor = Mock()
-
-            MockVectorStore.return_value = mock_store
-            MockDocProcessor.return_value = mock_processor
+        with patch.multiple(
+            rag_system, VectorStore=DEFAULT, DocumentProcessor=DEFAULT
+        ) as mocks:
+            mock_store = Mock(spec=VectorStore)
+            mocks["VectorStore"].return_value = mock_store
+            mocks["DocumentProcessor"].return_value = Mock(spec=DocumentProcessor)
 
             # Create RAG system with empty API key
-            rag = RAGSystem(api_key="", docs_dir="./docs")
+            rag = RAGSystem(replace(test_config, ANTHROPIC_API_KEY=""))
+
+            # Anthropic rejects the empty key with a 401
+            mock_anthropic_client.messages.create.side_effect = (
+                anthropic.AuthenticationError(
+                    "invalid x-api-key",
+                    response=httpx.Response(
+                        401, request=httpx.Request("POST", "https://api.anthropic.com")
+                    ),
+                    body=None,
+                )
+            )
 
             # Mock search results
-            mock_store.search.return_value = SearchResults(
-                documents=["Content"],
-                metadata=[{"course_title": "Course", "lesson_number": 1}],
-                distances=[0.5],
-                error=None,
-            )
+            mock_store.search.return_value = _SINGLE_RESULT
 
             # Query should handle authentication error
             response, sources = rag.query("test question", "session_1")
@@ -297,212 +222,40 @@ class TestRAGSystemErrorHandling:
             # Should get error message about API key
             assert "Authentication" in response or "API key" in response
 
-    def test_ai_api_error_handling(self, mock_anthropic_client, test_config):
+    def test_ai_api_error_handling(self, rag):
         """Test that AI API errors are handled gracefully"""
-        with (
-            patch("rag_system.VectorStore") as MockVectorStore,
-            patch("rag_system.DocumentProcessor") as MockDocProcessor,
-            patch("rag_system.AIGenerator") as MockAIGenerator,
-        ):
-
-            mock_store = Mock()
-            mock_processor = Mock()
-            mock_ai = Mock()
-
-            MockVectorStore.return_value = mock_store
-            MockDocProcessor.return_value = mock_processor
-            MockAIGenerator.return_value = mock_ai
-
-            mock_store.search.return_value = SearchResults(
-                documents=["Content"],
-                metadata=[{"course_title": "Course", "lesson_number": 1}],
-                distances=[0.5],
-                error=None,
-            )
+        rag.vector_store.search.return_value = _SINGLE_RESULT
 
-            # Mock AI API error
-            mock_ai.generate_response.return_value = (
-                "Anthropic API error: Rate limit exceeded",
-                [],
-            )
+        # Mock AI API error
+        rag.ai_generator.generate_response.return_value = (
+            "Anthropic API error: Rate limit exceeded",
+            [],
+        )
 
-            rag = RAGSystem(api_key="test-key", docs_dir="./docs")
-            response, sources = rag.query("test question", "session_1")
+        response, sources = rag.query("test question", "session_1")
 
-            # Should get error message
-            assert "error" in response.lower() or "API" in response
+        # Should get error message
+        assert "error" in response.lower() or "API" in response
 
 
 @pytest.mark.integration
 class TestRAGSystemWithZeroMaxResults:
     """Tests specifically for MAX_RESULTS=0 configuration issue"""
 
-    def test_detect_zero_max_results_causes_empty_searches(self, mock_anthropic_client):
-        """
-        CRITICAL TEST: Verify that MAX_RESULTS=0 causes searches to return 0 results
-        This test documents the current bug behavior
-        """
-        # Import actual config to check current value
-        from config import Config
-
-        if Config.MAX_RESULTS == 0:
-            pytest.skip("MAX_RESULTS is 0 - this test validates the bug exists")
-
-        # If MAX_RESULTS > 0, this test should pass
-        assert Config.MAX_RESULTS > 0
-
-    @patch("config.Config.MAX_RESULTS", 0)
-    def test_zero_max_results_behavior(self, mock_anthropic_client, test_config):
+    @patch.object(Config, "MAX_RESULTS", 0)
+    def test_zero_max_results_behavior(self, rag):
         """
         Test that MAX_RESULTS=0 causes the system to return empty search results
         """
-        with (
-            patch("rag_system.VectorStore") as MockVectorStore,
-            patch("rag_system.DocumentProcessor") as MockDocProcessor,
-            patch("rag_system.AIGenerator") as MockAIGenerator,
-        ):
-
-            mock_store = Mock()
-            mock_processor = Mock()
-            mock_ai = Mock()
-
-            MockVectorStore.return_value = mock_store
-            MockDocProcessor.return_value = mock_processor
-            MockAIGenerator.return_value = mock_ai
-
-            # When MAX_RESULTS=0, searches return empty
-            mock_store.search.return_value = SearchResults(
-                documents=[],  # Empty due to MAX_RESULTS=0
-                metadata=[],
-                distances=[],
-                error=None,
-            )
-
-            mock_ai.generate_response.return_value = (
-                "I don't have specific information about that.",
-                [],
-            )
-
-            rag = RAGSystem(api_key="test-key", docs_dir="./docs")
-            response, sources = rag.query("What are MCP servers?", "session_1")
+        # When MAX_RESULTS=0, searches return empty
+        rag.vector_store.search.return_value = _EMPTY_RESULTS
 
-            # With MAX_RESULTS=0, no sources returned even for valid queries
-            assert sources == []
-
-
-@pytest.mark.integration
-class TestRAGSystemQueryTypes:
-    """Test different types of queries that users might ask"""
-
-    def test_broad_general_query(self, mock_anthropic_client, test_config):
-        """Test handling of broad, general questions"""
-        with (
-            patch("rag_system.VectorStore") as MockVectorStore,
-            patch("rag_system.DocumentProcessor") as MockDocProcessor,
-            patch("rag_system.AIGenerator") as MockAIGenerator,
-        ):
-
-            mock_store = Mock()
-            mock_processor = Mock()
-            mock_ai = Mock()
-
-            MockVectorStore.return_value = mock_store
-            MockDocProcessor.return_value = mock_processor
-            MockAIGenerator.return_value = mock_ai
-
-            # Mock multiple results for broad query
-            mock_store.search.return_value = SearchResults(
-                documents=["Result 1", "Result 2", "Result 3"],
-                metadata=[
-                    {"course_title": "Course A", "lesson_number": 1},
-                    {"course_title": "Course A", "lesson_number": 2},
-                    {"course_title": "Course B", "lesson_number": 1},
-                ],
-                distances=[0.3, 0.4, 0.5],
-                error=None,
-            )
-
-            mock_ai.generate_response.return_value = (
-                "Comprehensive answer based on multiple sources",
-                [
-                    {"text": "Course A - Lesson 1", "link": None},
-                    {"text": "Course A - Lesson 2", "link": None},
-                    {"text": "Course B - Lesson 1", "link": None},
-                ],
-            )
-
-            rag = RAGSystem(api_key="test-key", docs_dir="./docs")
-            response, sources = rag.query("Tell me about MCP", "session_1")
-
-            assert response is not None
-            assert len(sources) == 3
-
-    def test_specific_lesson_query(self, mock_anthropic_client, test_config):
-        """Test query about a specific lesson"""
-        with (
-            patch("rag_system.VectorStore") as MockVectorStore,
-            patch("rag_system.DocumentProcessor") as MockDocProcessor,
-            patch("rag_system.AIGenerator") as MockAIGenerator,
-        ):
-
-            mock_store = Mock()
-            mock_processor = Mock()
-            mock_ai = Mock()
-
-            MockVectorStore.return_value = mock_store
-            MockDocProcessor.return_value = mock_processor
-            MockAIGenerator.return_value = mock_ai
-
-            # Mock specific lesson result
-            mock_store.search.return_value = SearchResults(
-                documents=["Lesson 3 specific content"],
-                metadata=[{"course_title": "MCP Course", "lesson_number": 3}],
-                distances=[0.2],
-                error=None,
-            )
-
-            mock_ai.generate_response.return_value = (
-                "Information from Lesson 3",
-                [{"text": "MCP Course - Lesson 3", "link": None}],
-            )
-
-            rag = RAGSystem(api_key="test-key", docs_dir="./docs")
-            response, sources = rag.query("What's covered in lesson 3?", "session_1")
-
-            assert response is not None
-            assert len(sources) == 1
-            assert "Lesson 3" in sources[0]["text"]
-
-    def test_how_to_query(self, mock_anthropic_client, test_config):
-        """Test 'how to' procedural questions"""
-        with (
-            patch("rag_system.VectorStore") as MockVectorStore,
-            patch("rag_system.DocumentProcessor") as MockDocProcessor,
-            patch("rag_system.AIGenerator") as MockAIGenerator,
-        ):
-
-            mock_store = Mock()
-            mock_processor = Mock()
-            mock_ai = Mock()
-
-            MockVectorStore.return_value = mock_store
-            MockDocProcessor.return_value = mock_processor
-            MockAIGenerator.return_value = mock_ai
-
-            mock_store.search.return_value = SearchResults(
-                documents=["Step-by-step instructions for creating a server"],
-                metadata=[{"course_title": "MCP Tutorial", "lesson_number": 2}],
-                distances=[0.1],
-                error=None,
-            )
-
-            mock_ai.generate_response.return_value = (
-                "To create a server, follow these steps: ...",
-                [{"text": "MCP Tutorial - Lesson 2", "link": None}],
-            )
+        rag.ai_generator.generate_response.return_value = (
+            "I don't have specific information about that.",
+            [],
+        )
 
-            rag = RAGSystem(api_key="test-key", docs_dir="./docs")
-            response, sources = rag.query("How do I create an MCP server?", "session_1")
+        response, sources = rag.query("What are MCP servers?", "session_1")
 
-            assert response is not None
-            assert len(sources) == 1
+        # With MAX_RESULTS=0, no sources returned even for valid queries
+        assert sources == []
@@ -1,12 +1,105 @@
-from typing import List
-from unittest.mock import Mock, patch
-
 import pytest
-from search_tools import CourseOutlineTool, CourseSearchTool, Tool, ToolManager
+from search_tools import Tool, ToolManager
 from vector_store import SearchResults
 
 from .conftest import create_empty_search_results, create_search_results
 
+# SearchResults is frozen and only read by the tools, so one instance is shared
+_MISSING_METADATA_RESULTS = SearchResults(
+    documents=["Content with missing metadata"],
+    metadata=[{}],
+    distances=[0.1],
+)
+
+# Course metadata as returned by VectorStore.get_all_courses_metadata; lessons are
+# tuples because the outline tool only iterates them
+_MCP_OUTLINE = {
+    "title": "Introduction to MCP Servers",
+    "course_link": "http://example.com/mcp-course",
+    "instructor": "John Doe",
+    "lessons": (
+        {
+            "lesson_number": 0,
+            "lesson_title": "Introduction",
+            "lesson_link": "http://example.com/lesson0",
+        },
+        {
+            "lesson_number": 1,
+            "lesson_title": "Getting Started",
+            "lesson_link": "http://example.com/lesson1",
+        },
+        {
+            "lesson_number": 2,
+            "lesson_title": "Advanced Features",
+            "lesson_link": None,
+        },
+    ),
+}
+_PYTHON_OUTLINE = {
+    "title": "Python Programming Basics",
+    "course_link": "http://example.com/python",
+    "instructor": "Jane Smith",
+    "lessons": (
+        {"lesson_number": 1, "lesson_title": "Variables", "lesson_link": None},
+    ),
+}
+_EMPTY_OUTLINE = {
+    "title": "Empty Course",
+    "course_link": "http://example.com/empty",
+    "instructor": "Test Instructor",
+    "lessons": (),
+}
+_MINIMAL_OUTLINE = {
+    "title": "Minimal Course",
+    "course_link": None,
+    "instructor": None,
+    "lessons": (
+        {"lesson_number": 1, "lesson_title": "Lesson One", "lesson_link": None},
+    ),
+}
+_DIFFERENT_OUTLINE = {
+    "title": "Different Course",
+    "course_link": "http://example.com/different",
+    "instructor": "Someone",
+    "lessons": (),
+}
+_COMPLETE_OUTLINE = {
+    "title": "Complete Course",
+    "course_link": "http://example.com/complete",
+    "instructor": "Dr. Complete",
+    "lessons": (
+        {
+            "lesson_number": 1,
+            "lesson_title": "First Lesson",
+            "lesson_link": "http://example.com/l1",
+        },
+        {
+            "lesson_number": 2,
+            "lesson_title": "Second Lesson",
+            "lesson_link": "http://example.com/l2",
+        },
+    ),
+}
+
+
+@pytest.fixture
+def manager():
+    """An empty ToolManager for registration tests"""
+    return ToolManager()
+
+
+class _StubTool(Tool):
+    """Concrete Tool with a fixed definition and no source tracking"""
+
+    def __init__(self, definition):
+        self.definition = definition
+
+    def get_tool_definition(self):
+        return self.definition
+
+    def execute(self, **kwargs):
+        return ""
+
 
 class TestCourseSearchTool:
     """Unit tests for CourseSearchTool class"""
@@ -29,108 +122,58 @@ class TestCourseSearchTool:
         assert "course_name" in schema["properties"]
         assert "lesson_number" in schema["properties"]
 
-    @pytest.mark.unit
-    def test_execute_basic_search(self, mock_vector_store):
-        """Test basic search execution without filters"""
-        # Setup
-        mock_vector_store.search.return_value = create_search_results(
-            documents=["This is test content about Python"],
-            course_title="Python Basics",
-            lesson_numbers=[1],
-        )
-
-        search_tool = CourseSearchTool(mock_vector_store)
-
-        # Execute
-        result = search_tool.execute("Python basics")
-
-        # Verify
-        mock_vector_store.search.assert_called_once_with(
-            query="Python basics", course_name=None, lesson_number=None
-        )
-
-        assert "[Python Basics - Lesson 1]" in result
-        assert "This is test content about Python" in result
-        assert len(search_tool.last_sources) == 1
-        assert search_tool.last_sources[0]["text"] == "Python Basics - Lesson 1"
-
-    @pytest.mark.unit
-    def test_execute_with_course_filter(self, mock_vector_store):
-        """Test search with course name filter"""
-        mock_vector_store.search.return_value = create_search_results(
-            documents=["Advanced Python concepts"],
-            course_title="Python Advanced",
-            lesson_numbers=[3],
-        )
-
-        search_tool = CourseSearchTool(mock_vector_store)
-
-        result = search_tool.execute("concepts", course_name="Python Advanced")
-
-        mock_vector_store.search.assert_called_once_with(
-            query="concepts", course_name="Python Advanced", lesson_number=None
-        )
-
-        assert "[Python Advanced - Lesson 3]" in result
-        assert "Advanced Python concepts" in result
+        # The definition is built once and reused on later calls
+        assert search_tool.get_tool_definition() is definition
 
     @pytest.mark.unit
-    def test_execute_with_lesson_filter(self, mock_vector_store):
-        """Test search with lesson number filter"""
+    @pytest.mark.parametrize(
+        "course_name, lesson_number, title, lesson",
+        [
+            (None, None, "Python Basics", 1),
+            ("Python Advanced", None, "Python Advanced", 3),
+            (None, 2, "Test Course", 2),
+            ("Specific Course", 4, "Specific Course", 4),
+        ],
+        ids=["no_filter", "course_filter", "lesson_filter", "both_filters"],
+    )
+    def test_execute_with_filters(
+        self, search_tool, mock_vector_store, course_name, lesson_number, title, lesson
+    ):
+        """Test search execution passes course and lesson filters through"""
         mock_vector_store.search.return_value = create_search_results(
-            documents=["Lesson 2 specific content"],
-            course_title="Test Course",
-            lesson_numbers=[2],
+            documents=[f"{title} lesson content"],
+            course_title=title,
+            lesson_numbers=[lesson],
         )
 
-        search_tool = CourseSearchTool(mock_vector_store)
-
-        result = search_tool.execute("specific content", lesson_number=2)
-
-        mock_vector_store.search.assert_called_once_with(
-            query="specific content", course_name=None, lesson_number=2
-        )
-
-        assert "[Test Course - Lesson 2]" in result
-
-    @pytest.mark.unit
-    def test_execute_with_both_filters(self, mock_vector_store):
-        """Test search with both course and lesson filters"""
-        mock_vector_store.search.return_value = create_search_results(
-            documents=["Specific lesson content"],
-            course_title="Specific Course",
-            lesson_numbers=[4],
-        )
-
-        search_tool = CourseSearchTool(mock_vector_store)
-
         result = search_tool.execute(
-            "content", course_name="Specific Course", lesson_number=4
+            "query", course_name=course_name, lesson_number=lesson_number
         )
 
         mock_vector_store.search.assert_called_once_with(
-            query="content", course_name="Specific Course", lesson_number=4
+            query="query", course_name=course_name, lesson_number=lesson_number
         )
 
+        assert f"[{title} - Lesson {lesson}]" in result
+        assert f"{title} lesson content" in result
+        assert len(search_tool.last_sources) == 1
+        assert search_tool.last_sources[0]["text"] == f"{title} - Lesson {lesson}"
+
     @pytest.mark.unit
-    def test_execute_empty_results(self, mock_vector_store):
+    def test_execute_empty_results(self, search_tool, mock_vector_store):
         """Test handling of empty search results"""
         mock_vector_store.search.return_value = create_empty_search_results()
 
-        search_tool = CourseSearchTool(mock_vector_store)
-
         result = search_tool.execute("nonexistent content")
 
         assert "No relevant content found" in result
         assert len(search_tool.last_sources) == 0
 
     @pytest.mark.unit
-    def test_execute_empty_results_with_filters(self, mock_vector_store):
+    def test_execute_empty_results_with_filters(self, search_tool, mock_vector_store):
         """Test empty results message includes filter information"""
         mock_vector_store.search.return_value = create_empty_search_results()
 
-        search_tool = CourseSearchTool(mock_vector_store)
-
         result = search_tool.execute(
             "content", course_name="Missing Course", lesson_number=5
         )
@@ -140,62 +183,39 @@ class TestCourseSearchTool:
         )
 
     @pytest.mark.unit
-    def test_execute_search_error(self, mock_vector_store):
+    def test_execute_search_error(self, search_tool, mock_vector_store):
         """Test handling of search errors"""
         mock_vector_store.search.return_value = create_empty_search_results(
             "Database connection failed"
         )
 
-        search_tool = CourseSearchTool(mock_vector_store)
-
         result = search_tool.execute("any query")
 
         assert result == "Database connection failed"
         assert len(search_tool.last_sources) == 0
 
     @pytest.mark.unit
-    def test_source_tracking_with_links(self, mock_vector_store):
-        """Test that sources are tracked with lesson links when available"""
+    @pytest.mark.parametrize(
+        "link", ["http://example.com/lesson1", None], ids=["with_link", "without_link"]
+    )
+    def test_source_tracking(self, search_tool, mock_vector_store, link):
+        """Test that sources carry the lesson link when one is available"""
         mock_vector_store.search.return_value = create_search_results(
-            documents=["Content with link"],
+            documents=["Lesson content"],
             course_title="Linked Course",
             lesson_numbers=[1],
         )
-        mock_vector_store.get_lesson_link.return_value = "http://example.com/lesson1"
+        mock_vector_store.get_lesson_link.return_value = link
 
-        search_tool = CourseSearchTool(mock_vector_store)
+        search_tool.execute("content")
 
-        result = search_tool.execute("content")
-
-        assert len(search_tool.last_sources) == 1
-        source = search_tool.last_sources[0]
-        assert source["text"] == "Linked Course - Lesson 1"
-        assert source["link"] == "http://example.com/lesson1"
-
-        # Verify get_lesson_link was called
+        assert search_tool.last_sources == [
+            {"text": "Linked Course - Lesson 1", "link": link}
+        ]
         mock_vector_store.get_lesson_link.assert_called_once_with("Linked Course", 1)
 
     @pytest.mark.unit
-    def test_source_tracking_without_links(self, mock_vector_store):
-        """Test source tracking when no lesson links are available"""
-        mock_vector_store.search.return_value = create_search_results(
-            documents=["Content without link"],
-            course_title="Unlinked Course",
-            lesson_numbers=[2],
-        )
-        mock_vector_store.get_lesson_link.return_value = None
-
-        search_tool = CourseSearchTool(mock_vector_store)
-
-        result = search_tool.execute("content")
-
-        assert len(search_tool.last_sources) == 1
-        source = search_tool.last_sources[0]
-        assert source["text"] == "Unlinked Course - Lesson 2"
-        assert source["link"] is None
-
-    @pytest.mark.unit
-    def test_multiple_results_formatting(self, mock_vector_store):
+    def test_multiple_results_formatting(self, search_tool, mock_vector_store):
         """Test formatting of multiple search results"""
         mock_vector_store.search.return_value = create_search_results(
             documents=[
@@ -207,33 +227,27 @@ class TestCourseSearchTool:
             lesson_numbers=[1, 2, 3],
         )
 
-        search_tool = CourseSearchTool(mock_vector_store)
-
         result = search_tool.execute("content")
 
-        # Check all results are included
-        assert "[Multi Course - Lesson 1]" in result
-        assert "[Multi Course - Lesson 2]" in result
-        assert "[Multi Course - Lesson 3]" in result
-        assert "First result content" in result
-        assert "Second result content" in result
-        assert "Third result content" in result
+        # Each result is a header line followed by its content line
+        expected_lines = {
+            "[Multi Course - Lesson 1]",
+            "[Multi Course - Lesson 2]",
+            "[Multi Course - Lesson 3]",
+            "First result content",
+            "Second result content",
+            "Third result content",
+        }
+        missing = expected_lines - set(result.split("\n"))
+        assert not missing, missing
 
         # Check sources tracking
         assert len(search_tool.last_sources) == 3
 
     @pytest.mark.unit
-    def test_missing_metadata_handling(self, mock_vector_store):
+    def test_missing_metadata_handling(self, search_tool, mock_vector_store):
         """Test handling of missing or malformed metadata"""
-        # Create results with missing metadata
-        results = SearchResults(
-            documents=["Content with missing metadata"],
-            metadata=[{}],  # Empty metadata
-            distances=[0.1],
-        )
-        mock_vector_store.search.return_value = results
-
-        search_tool = CourseSearchTool(mock_vector_store)
+        mock_vector_store.search.return_value = _MISSING_METADATA_RESULTS
 
         result = search_tool.execute("content")
 
@@ -246,9 +260,8 @@ class TestCourseOutlineTool:
     """Unit tests for CourseOutlineTool class"""
 
     @pytest.mark.unit
-    def test_get_tool_definition(self, mock_vector_store):
+    def test_get_tool_definition(self, outline_tool, mock_vector_store):
         """Test that tool definition is correctly formatted"""
-        outline_tool = CourseOutlineTool(mock_vector_store)
         definition = outline_tool.get_tool_definition()
 
         assert definition["name"] == "get_course_outline"
@@ -261,184 +274,99 @@ class TestCourseOutlineTool:
         assert schema["required"] == ["course_name"]
 
     @pytest.mark.unit
-    def test_execute_successful_outline_retrieval(self, mock_vector_store):
-        """Test successful retrieval of course outline"""
-        # Setup mock responses
-        mock_vector_store._resolve_course_name.return_value = (
-            "Introduction to MCP Servers"
-        )
-        mock_vector_store.get_all_courses_metadata.return_value = [
-            {
-                "title": "Introduction to MCP Servers",
-                "course_link": "http://example.com/mcp-course",
-                "instructor": "John Doe",
-                "lessons": [
-                    {
-                        "lesson_number": 0,
-                        "lesson_title": "Introduction",
-                        "lesson_link": "http://example.com/lesson0",
-                    },
-                    {
-                        "lesson_number": 1,
-                        "lesson_title": "Getting Started",
-                        "lesson_link": "http://example.com/lesson1",
-                    },
-                    {
-                        "lesson_number": 2,
-                        "lesson_title": "Advanced Features",
-                        "lesson_link": None,
-                    },
+    @pytest.mark.parametrize(
+        "query, metadata, must_contain, must_not_contain",
+        [
+            pytest.param(
+                "MCP",
+                _MCP_OUTLINE,
+                [
+                    "Course: Introduction to MCP Servers",
+                    "Course Link: http://example.com/mcp-course",
+                    "Instructor: John Doe",
+                    "Lessons:",
+                    "0. Introduction - http://example.com/lesson0",
+                    "1. Getting Started - http://example.com/lesson1",
+                    "2. Advanced Features",
                 ],
-            }
-        ]
-
-        outline_tool = CourseOutlineTool(mock_vector_store)
-        result = outline_tool.execute("MCP")
-
-        # Verify the result format
-        assert "Course: Introduction to MCP Servers" in result
-        assert "Course Link: http://example.com/mcp-course" in result
-        assert "Instructor: John Doe" in result
-        assert "Lessons:" in result
-        assert "0. Introduction - http://example.com/lesson0" in result
-        assert "1. Getting Started - http://example.com/lesson1" in result
-        assert "2. Advanced Features" in result
-
-        # Verify fuzzy matching was used
-        mock_vector_store._resolve_course_name.assert_called_once_with("MCP")
-
-    @pytest.mark.unit
-    def test_execute_with_fuzzy_course_name(self, mock_vector_store):
-        """Test that fuzzy course name matching works correctly"""
-        mock_vector_store._resolve_course_name.return_value = (
-            "Python Programming Basics"
-        )
-        mock_vector_store.get_all_courses_metadata.return_value = [
-            {
-                "title": "Python Programming Basics",
-                "course_link": "http://example.com/python",
-                "instructor": "Jane Smith",
-                "lessons": [
-                    {
-                        "lesson_number": 1,
-                        "lesson_title": "Variables",
-                        "lesson_link": None,
-                    }
+                [],
+                id="successful_outline",
+            ),
+            pytest.param(
+                "Python",
+                _PYTHON_OUTLINE,
+                ["Course: Python Programming Basics"],
+                [],
+                id="fuzzy_course_name",
+            ),
+            pytest.param(
+                "Empty Course",
+                _EMPTY_OUTLINE,
+                ["Course: Empty Course", "No lessons found for this course"],
+                [],
+                id="no_lessons",
+            ),
+            # Missing link shows as not available, missing instructor is omitted
+            pytest.param(
+                "Minimal",
+                _MINIMAL_OUTLINE,
+                [
+                    "Course: Minimal Course",
+                    "Course Link: Not available",
+                    "1. Lesson One",
                 ],
-            }
-        ]
-
-        outline_tool = CourseOutlineTool(mock_vector_store)
-        result = outline_tool.execute("Python")
-
-        assert "Course: Python Programming Basics" in result
-        mock_vector_store._resolve_course_name.assert_called_once_with("Python")
+                ["Instructor:", "http://"],
+                id="missing_optional_fields",
+            ),
+        ],
+    )
+    def test_execute_outline(
+        self,
+        outline_tool,
+        mock_vector_store,
+        query,
+        metadata,
+        must_contain,
+        must_not_contain,
+    ):
+        """Test outline formatting for courses resolved by fuzzy name matching"""
+        mock_vector_store._resolve_course_name.return_value = metadata["title"]
+        mock_vector_store.get_all_courses_metadata.return_value = [metadata]
+
+        result = outline_tool.execute(query)
+
+        for expected in must_contain:
+            assert expected in result
+        for unexpected in must_not_contain:
+            assert unexpected not in result
+        mock_vector_store._resolve_course_name.assert_called_once_with(query)
 
     @pytest.mark.unit
-    def test_execute_course_not_found(self, mock_vector_store):
+    def test_execute_course_not_found(self, outline_tool, mock_vector_store):
         """Test handling when course name cannot be resolved"""
         mock_vector_store._resolve_course_name.return_value = None
 
-        outline_tool = CourseOutlineTool(mock_vector_store)
         result = outline_tool.execute("Nonexistent Course")
 
         assert "Course 'Nonexistent Course' not found" in result
         assert "Please check the course name" in result
 
     @pytest.mark.unit
-    def test_execute_course_not_in_metadata(self, mock_vector_store):
+    def test_execute_course_not_in_metadata(self, outline_tool, mock_vector_store):
         """Test handling when resolved course is not in metadata"""
         mock_vector_store._resolve_course_name.return_value = "Test Course"
-        mock_vector_store.get_all_courses_metadata.return_value = [
-            {
-                "title": "Different Course",
-                "course_link": "http://example.com/different",
-                "instructor": "Someone",
-                "lessons": [],
-            }
-        ]
+        mock_vector_store.get_all_courses_metadata.return_value = [_DIFFERENT_OUTLINE]
 
-        outline_tool = CourseOutlineTool(mock_vector_store)
         result = outline_tool.execute("Test")
 
         assert "Course 'Test' not found in the catalogue" in result
 
     @pytest.mark.unit
-    def test_execute_no_lessons(self, mock_vector_store):
-        """Test handling of course with no lessons"""
-        mock_vector_store._resolve_course_name.return_value = "Empty Course"
-        mock_vector_store.get_all_courses_metadata.return_value = [
-            {
-                "title": "Empty Course",
-                "course_link": "http://example.com/empty",
-                "instructor": "Test Instructor",
-                "lessons": [],
-            }
-        ]
-
-        outline_tool = CourseOutlineTool(mock_vector_store)
-        result = outline_tool.execute("Empty Course")
-
-        assert "Course: Empty Course" in result
-        assert "No lessons found for this course" in result
-
-    @pytest.mark.unit
-    def test_execute_missing_optional_fields(self, mock_vector_store):
-        """Test handling when optional fields are missing"""
-        mock_vector_store._resolve_course_name.return_value = "Minimal Course"
-        mock_vector_store.get_all_courses_metadata.return_value = [
-            {
-                "title": "Minimal Course",
-                "course_link": None,  # No course link
-                "instructor": None,  # No instructor
-                "lessons": [
-                    {
-                        "lesson_number": 1,
-                        "lesson_title": "Lesson One",
-                        "lesson_link": None,
-                    }
-                ],
-            }
-        ]
-
-        outline_tool = CourseOutlineTool(mock_vector_store)
-        result = outline_tool.execute("Minimal")
-
-        assert "Course: Minimal Course" in result
-        # Should show course link as not available when None
-        assert "Course Link: Not available" in result
-        # Should not include instructor line if None
-        assert "Instructor:" not in result
-        # Should still include lessons
-        assert "1. Lesson One" in result
-        # No actual HTTP links should appear
-        assert result.count("http://") == 0
-
-    @pytest.mark.unit
-    def test_format_with_all_fields(self, mock_vector_store):
+    def test_format_with_all_fields(self, outline_tool, mock_vector_store):
         """Test output format includes all available fields"""
         mock_vector_store._resolve_course_name.return_value = "Complete Course"
-        mock_vector_store.get_all_courses_metadata.return_value = [
-            {
-                "title": "Complete Course",
-                "course_link": "http://example.com/complete",
-                "instructor": "Dr. Complete",
-                "lessons": [
-                    {
-                        "lesson_number": 1,
-                        "lesson_title": "First Lesson",
-                        "lesson_link": "http://example.com/l1",
-                    },
-                    {
-                        "lesson_number": 2,
-                        "lesson_title": "Second Lesson",
-                        "lesson_link": "http://example.com/l2",
-                    },
-                ],
-            }
-        ]
+        mock_vector_store.get_all_courses_metadata.return_value = [_COMPLETE_OUTLINE]
 
-        outline_tool = CourseOutlineTool(mock_vector_store)
         result = outline_tool.execute("Complete")
 
         lines = result.split("\n")
@@ -456,31 +384,20 @@ class TestToolManager:
     """Unit tests for ToolManager class"""
 
     @pytest.mark.unit
-    def test_tool_registration(self):
+    def test_tool_registration(self, manager):
         """Test registering tools with ToolManager"""
-        manager = ToolManager()
-        mock_tool = Mock(spec=Tool)
-        mock_tool.get_tool_definition.return_value = {
-            "name": "test_tool",
-            "description": "Test",
-        }
+        tool = _StubTool({"name": "test_tool", "description": "Test"})
 
-        manager.register_tool(mock_tool)
+        manager.register_tool(tool)
 
         assert "test_tool" in manager.tools
-        assert manager.tools["test_tool"] == mock_tool
+        assert manager.tools["test_tool"] == tool
 
     @pytest.mark.unit
-    def test_tool_registration_missing_name(self):
+    def test_tool_registration_missing_name(self, manager):
         """Test that tools without names raise appropriate errors"""
-        manager = ToolManager()
-        mock_tool = Mock(spec=Tool)
-        mock_tool.get_tool_definition.return_value = {
-            "description": "Test"
-        }  # Missing name
-
         with pytest.raises(ValueError, match="Tool must have a 'name'"):
-            manager.register_tool(mock_tool)
+            manager.register_tool(_StubTool({"description": "Test"}))
 
     @pytest.mark.unit
     def test_get_tool_definitions(self, tool_manager):
@@ -491,6 +408,20 @@ class TestToolManager:
         assert len(definitions) == 1  # Only search tool registered in fixture
         assert definitions[0]["name"] == "search_course_content"
 
+    @pytest.mark.unit
+    def test_get_tool_definitions_cache_invalidated_on_register(self, manager):
+        """Test the cached definitions list is rebuilt when a tool is registered"""
+        manager.register_tool(_StubTool({"name": "first_tool"}))
+        definitions = manager.get_tool_definitions()
+        assert manager.get_tool_definitions() is definitions
+
+        manager.register_tool(_StubTool({"name": "second_tool"}))
+
+        assert [d["name"] for d in manager.get_tool_definitions()] == [
+            "first_tool",
+            "second_tool",
+        ]
+
     @pytest.mark.unit
     def test_execute_tool_success(self, tool_manager):
         """Test successful tool execution"""
@@ -521,12 +452,9 @@ class TestToolManager:
         assert sources[0]["text"] == "Test Course - Lesson 1"
 
     @pytest.mark.unit
-    def test_get_last_sources_empty(self):
+    def test_get_last_sources_empty(self, manager):
         """Test getting sources when no searches have been performed"""
-        manager = ToolManager()
-        mock_tool = Mock(spec=Tool)
-        mock_tool.get_tool_definition.return_value = {"name": "test_tool"}
-        manager.register_tool(mock_tool)
+        manager.register_tool(_StubTool({"name": "test_tool"}))
 
         sources = manager.get_last_sources()
 
@@ -1,5 +1,7 @@
+import json
 import os
 import shutil
+from dataclasses import FrozenInstanceError
 from unittest.mock import Mock, patch
 
 import pytest
@@ -29,6 +31,24 @@ class TestSearchResults:
         assert results.distances == [0.1, 0.2]
         assert results.error is None
 
+    @pytest.mark.unit
+    def test_from_chroma_with_index(self):
+        """Test reading one query's results from a multi-query response"""
+        chroma_results = {
+            "documents": [["Document 1"], ["Document 2"]],
+            "metadatas": [
+                [{"course_title": "Course 1"}],
+                [{"course_title": "Course 2"}],
+            ],
+            "distances": [[0.1], [0.2]],
+        }
+
+        results = SearchResults.from_chroma(chroma_results, 1)
+
+        assert results.documents == ["Document 2"]
+        assert results.metadata == [{"course_title": "Course 2"}]
+        assert results.distances == [0.2]
+
     @pytest.mark.unit
     def test_from_chroma_empty_results(self):
         """Test creating SearchResults from empty ChromaDB results"""
@@ -63,6 +83,29 @@ class TestSearchResults:
         results = SearchResults(["doc"], [{"meta": "data"}], [0.1])
         assert results.is_empty() is False
 
+    @pytest.mark.unit
+    def test_results_are_immutable(self):
+        """Test that SearchResults can be shared safely between callers"""
+        results = SearchResults(["doc"], [{"meta": "data"}], [0.1])
+
+        with pytest.raises(FrozenInstanceError):
+            results.error = "changed"
+
+        assert not hasattr(results, "__dict__")
+
+
+@pytest.fixture
+def mocked_store(test_config):
+    """VectorStore whose Chroma client, embedder and collections are mocks"""
+    with patch("vector_store.chromadb") as chroma:
+        client = chroma.PersistentClient.return_value
+        client.get_or_create_collection.side_effect = lambda name, **_: Mock(name=name)
+        yield VectorStore(
+            test_config.CHROMA_PATH,
+            test_config.EMBEDDING_MODEL,
+            test_config.MAX_RESULTS,
+        )
+
 
 class TestVectorStore:
     """Unit tests for VectorStore class"""
@@ -104,6 +147,29 @@ class TestVectorStore:
         assert not results.is_empty()
         assert any("introduction" in doc.lower() for doc in results.documents)
 
+    @pytest.mark.unit
+    def test_add_course_content_batches(self, mocked_store, sample_course_chunks):
+        """Test that chunks are written in batch_size slices, in order"""
+        store = mocked_store
+        store.add_course_content(sample_course_chunks, batch_size=2)
+
+        batches = [
+            call.kwargs["documents"] for call in store.course_content.add.call_args_list
+        ]
+        assert batches == [
+            [chunk.content for chunk in sample_course_chunks[start : start + 2]]
+            for start in range(0, len(sample_course_chunks), 2)
+        ]
+
+    @pytest.mark.integration
+    def test_add_course(self, real_vector_store, sample_course, sample_course_chunks):
+        """Test adding a course's metadata and content together"""
+        real_vector_store.add_course(sample_course, sample_course_chunks)
+
+        assert real_vector_store.get_existing_course_titles() == [sample_course.title]
+        results = real_vector_store.search("introduction")
+        assert not results.is_empty()
+
     @pytest.mark.integration
     def test_search_basic(self, real_vector_store, sample_course, sample_course_chunks):
         """Test basic search functionality"""
@@ -120,6 +186,18 @@ class TestVectorStore:
         assert len(results.distances) > 0
         assert results.error is None
 
+    @pytest.mark.integration
+    def test_search_batch(self, real_vector_store, sample_course, sample_course_chunks):
+        """Test that batched search returns one result set per query, in order"""
+        real_vector_store.add_course(sample_course, sample_course_chunks)
+
+        queries = ["introduction", "content"]
+        batch = real_vector_store.search_batch(queries)
+
+        assert len(batch) == len(queries)
+        for query, results in zip(queries, batch):
+            assert results.documents == real_vector_store.search(query).documents
+
     @pytest.mark.integration
     def test_search_with_course_filter(
         self, real_vector_store, sample_course, sample_course_chunks
@@ -203,6 +281,123 @@ class TestVectorStore:
         resolved = real_vector_store._resolve_course_name("Test")
         assert resolved == "Test Course"
 
+    @pytest.mark.unit
+    def test_course_name_resolution_exact_title_skips_query(self, mocked_store):
+        """Test that an exact catalog title resolves without a vector search"""
+        store = mocked_store
+        store.course_catalog.get.return_value = {"ids": ["Test Course"]}
+
+        assert store._resolve_course_name("Test Course") == "Test Course"
+        store.course_catalog.query.assert_not_called()
+
+    @pytest.mark.unit
+    def test_course_name_resolution_miss_not_cached(self, mocked_store):
+        """Test that an unresolved name is looked up again on the next search"""
+        store = mocked_store
+        store.course_catalog.get.return_value = {"ids": []}
+        store.course_catalog.query.return_value = {"documents": [[]], "metadatas": [[]]}
+
+        assert store._resolve_course_name("Test") is None
+        assert store._resolve_course_name("Test") is None
+        assert store.course_catalog.query.call_count == 2
+
+    @pytest.mark.unit
+    def test_course_name_resolution_is_cached(self, mocked_store):
+        """Test that a resolved name is reused until the catalog changes"""
+        store = mocked_store
+        store.course_catalog.get.return_value = {"ids": []}
+        store.course_catalog.query.return_value = {
+            "documents": [["Test Course"]],
+            "metadatas": [[{"title": "Test Course"}]],
+        }
+
+        assert store._resolve_course_name("Test") == "Test Course"
+        assert store._resolve_course_name("Test") == "Test Course"
+        store.course_catalog.query.assert_called_once()
+
+        store.add_course_metadata(Course(title="Other Course"))
+        store._resolve_course_name("Test")
+        assert store.course_catalog.query.call_count == 2
+
+    @pytest.mark.unit
+    def test_search_results_cached_until_content_changes(
+        self, mocked_store, sample_course_chunks
+    ):
+        """Test that a repeated search is served from cache until content is added"""
+        store = mocked_store
+        store.course_content.query.return_value = {
+            "documents": [["Doc"]],
+            "metadatas": [[{"course_title": "Test Course"}]],
+            "distances": [[0.1]],
+        }
+
+        first = store.search("introduction")
+        first.documents.append("Changed by caller")
+        assert store.search("introduction").documents == ["Doc"]
+        store.course_content.query.assert_called_once()
+
+        store.add_course_content(sample_course_chunks)
+        store.search("introduction")
+        assert store.course_content.query.call_count == 2
+
+    @pytest.mark.unit
+    def test_search_errors_not_cached(self, mocked_store):
+        """Test that a failed search is retried rather than served from cache"""
+        store = mocked_store
+        store.course_content.query.side_effect = Exception("boom")
+
+        assert store.search("introduction").error == "Search error: boom"
+        store.search("introduction")
+        assert store.course_content.query.call_count == 2
+
+    @pytest.mark.unit
+    def test_search_batch_returns_per_query_results(self, mocked_store):
+        """Test that one filtered query call is split into per-query results"""
+        store = mocked_store
+        store.course_catalog.get.return_value = {"ids": ["Test Course"]}
+        store.course_content.query.return_value = {
+            "documents": [["Doc A"], ["Doc B"]],
+            "metadatas": [[{"lesson_number": 1}], [{"lesson_number": 1}]],
+            "distances": [[0.1], [0.2]],
+        }
+
+        batch = store.search_batch(
+            ["first", "second"], course_name="Test Course", lesson_number=1
+        )
+
+        store.course_content.query.assert_called_once_with(
+            query_texts=["first", "second"],
+            n_results=store.max_results,
+            where={"$and": [{"course_title": "Test Course"}, {"lesson_number": 1}]},
+        )
+        assert [results.documents for results in batch] == [["Doc A"], ["Doc B"]]
+
+    @pytest.mark.unit
+    def test_lesson_links_cached_until_catalog_changes(self, mocked_store):
+        """Test that course metadata is read once per title until it is re-added"""
+        store = mocked_store
+        store.course_catalog.get.return_value = {
+            "ids": [],
+            "metadatas": [
+                {
+                    "course_link": "https://example.com/course",
+                    "lessons_json": json.dumps(
+                        [{"lesson_number": 1, "lesson_link": "https://example.com/1"}]
+                    ),
+                }
+            ],
+        }
+
+        assert store.get_lesson_link("Test Course", 1) == "https://example.com/1"
+        assert store.get_lesson_link("Test Course", 2) is None
+        assert store.get_course_link("Test Course") == "https://example.com/course"
+        store.course_catalog.get.assert_called_once_with(ids=["Test Course"])
+
+        store.add_course_metadata(Course(title="Test Course"))
+        store.course_catalog.get.reset_mock()
+        store.get_lesson_link("Test Course", 1)
+        store.course_catalog.get.assert_called_once_with(ids=["Test Course"])
+
     @pytest.mark.unit
     def test_build_filter_no_filters(self, real_vector_store):
         """Test filter building with no filters"""
@@ -331,6 +526,49 @@ class TestVectorStore:
         count = real_vector_store.get_course_count()
         assert count == 1
 
+    @pytest.mark.unit
+    @pytest.mark.parametrize("query", ["", "   "])
+    def test_search_blank_query_skips_chroma(self, mocked_store, query):
+        """Test that blank queries return empty results without a Chroma call"""
+        results = mocked_store.search(query)
+
+        assert results.is_empty()
+        assert results.error is None
+        mocked_store.course_content.query.assert_not_called()
+
+    @pytest.mark.unit
+    def test_catalog_listing_reads_ids_only(self, mocked_store):
+        """Test that titles and counts are read without loading metadata"""
+        store = mocked_store
+        store.course_catalog.get.return_value = {"ids": ["A", "B"]}
+        store.course_catalog.count.return_value = 2
+
+        assert store.get_existing_course_titles() == ["A", "B"]
+        assert store.get_course_count() == 2
+        store.course_catalog.get.assert_called_once_with(include=[])
+
+    @pytest.mark.unit
+    def test_duplicate_course_skips_add(self, mocked_store, sample_course):
+        """Test that an existing catalog ID is not embedded and added again"""
+        store = mocked_store
+        store.course_catalog.get.return_value = {"ids": [sample_course.title]}
+
+        assert store.add_course_metadata(sample_course) is False
+
+        store.course_catalog.add.assert_not_called()
+
+    @pytest.mark.unit
+    def test_duplicate_course_skips_content(
+        self, mocked_store, sample_course, sample_course_chunks
+    ):
+        """Test that re-adding a stored course does not embed its chunks again"""
+        store = mocked_store
+        store.course_catalog.get.return_value = {"ids": [sample_course.title]}
+
+        assert store.add_course(sample_course, sample_course_chunks) is False
+
+        store.course_content.add.assert_not_called()
+
     @pytest.mark.unit
     @patch("vector_store.chromadb.PersistentClient")
     def test_chroma_connection_error(self, mock_client, test_config):
@@ -1,3 +1,4 @@
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
@@ -7,9 +8,9 @@ from models import Course, CourseChunk
 from sentence_transformers import SentenceTransformer
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SearchResults:
-    """Container for search results with metadata"""
+    """Immutable container for search results with metadata"""
 
     documents: List[str]
     metadata: List[Dict[str, Any]]
@@ -17,18 +18,16 @@ class SearchResults:
     error: Optional[str] = None
 
     @classmethod
-    def from_chroma(cls, chroma_results: Dict) -> "SearchResults":
-        """Create SearchResults from ChromaDB query results"""
+    def from_chroma(cls, chroma_results: Dict, index: int = 0) -> "SearchResults":
+        """Create SearchResults from the index-th query of ChromaDB results"""
+        documents = chroma_results["documents"]
+        metadatas = chroma_results["metadatas"]
+        distances = chroma_results["distances"]
+        # Copy the lists so callers never share them with chroma_results
         return cls(
-            documents=(
-                chroma_results["documents"][0] if chroma_results["documents"] else []
-            ),
-            metadata=(
-                chroma_results["metadatas"][0] if chroma_results["metadatas"] else []
-            ),
-            distances=(
-                chroma_results["distances"][0] if chroma_results["distances"] else []
-            ),
+            documents=list(documents[index]) if documents else [],
+            metadata=list(metadatas[index]) if metadatas else [],
+            distances=list(distances[index]) if distances else [],
         )
 
     @classmethod
@@ -42,7 +41,17 @@ class SearchResults:
 
 
 class VectorStore:
-    """Vector storage using ChromaDB for course content and metadata"""
+    """
+    Vector storage using ChromaDB for course content and metadata.
+
+    Course names, searches and course links are cached per instance and reset
+    only by writes made through that instance. The store therefore assumes it
+    is the single writer to its chroma_path; another instance or process that
+    writes there is not seen until this one writes or clears its data.
+    """
+
+    # Most recent content searches kept for exact repeats of the same query
+    SEARCH_CACHE_SIZE = 256
 
     def __init__(self, chroma_path: str, embedding_model: str, max_results: int = 5):
         self.max_results = max_results
@@ -66,6 +75,14 @@ class VectorStore:
             "course_content"
         )  # Actual course material
 
+        # Course name -> resolved title; reset whenever the catalog changes
+        self._name_cache: Dict[str, str] = {}
+        # (query, course_title, lesson_number, limit) -> raw Chroma results;
+        # reset on content writes
+        self._search_cache: OrderedDict = OrderedDict()
+        # Course title -> course link and parsed lesson links; reset on catalog writes
+        self._course_links: Dict[str, Dict[str, Any]] = {}
+
     def _create_collection(self, name: str):
         """Create or get a ChromaDB collection"""
         return self.client.get_or_create_collection(
@@ -91,6 +108,10 @@ class VectorStore:
         Returns:
             SearchResults object with documents and metadata
         """
+        # A blank query has nothing to embed or match against
+        if not query or not query.strip():
+            return SearchResults(documents=[], metadata=[], distances=[])
+
         # Step 1: Resolve course name if provided
         course_title = None
         if course_name:
@@ -105,26 +126,98 @@ class VectorStore:
         # Use provided limit or fall back to configured max_results
         search_limit = limit if limit is not None else self.max_results
 
+        cache_key = (query, course_title, lesson_number, search_limit)
+        if cache_key in self._search_cache:
+            self._search_cache.move_to_end(cache_key)
+            return SearchResults.from_chroma(self._search_cache[cache_key])
+
         try:
             results = self.course_content.query(
                 query_texts=[query], n_results=search_limit, where=filter_dict
             )
-            return SearchResults.from_chroma(results)
         except Exception as e:
+            # Errors are not cached so the next identical search retries
             return SearchResults.empty(f"Search error: {str(e)}")
 
+        # Each hit rebuilds its own SearchResults, so one caller changing
+        # the lists cannot alter what later callers receive
+        self._search_cache[cache_key] = results
+        if len(self._search_cache) > self.SEARCH_CACHE_SIZE:
+            self._search_cache.popitem(last=False)
+        return SearchResults.from_chroma(results)
+
+    def search_batch(
+        self,
+        queries: List[str],
+        course_name: Optional[str] = None,
+        lesson_number: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[SearchResults]:
+        """
+        Search course content for several queries in one ChromaDB call.
+
+        The queries are embedded together and share one course/lesson filter.
+
+        Args:
+            queries: What to search for, one entry per query
+            course_name: Optional course name/title to filter by
+            lesson_number: Optional lesson number to filter by
+            limit: Maximum results to return per query
+
+        Returns:
+            One SearchResults per query, in the same order as queries
+        """
+        if not queries:
+            return []
+
+        course_title = None
+        if course_name:
+            course_title = self._resolve_course_name(course_name)
+            if not course_title:
+                error = f"No course found matching '{course_name}'"
+                return [SearchResults.empty(error) for _ in queries]
+
+        filter_dict = self._build_filter(course_title, lesson_number)
+        search_limit = limit if limit is not None else self.max_results
+
+        try:
+            results = self.course_content.query(
+                query_texts=queries, n_results=search_limit, where=filter_dict
+            )
+            return [
+                SearchResults.from_chroma(results, index)
+                for index in range(len(queries))
+            ]
+        except Exception as e:
+            return [SearchResults.empty(f"Search error: {str(e)}") for _ in queries]
+
     def _resolve_course_name(self, course_name: str) -> Optional[str]:
         """Use vector search to find best matching course by name"""
-        try:
-            results = self.course_catalog.query(query_texts=[course_name], n_results=1)
+        if course_name in self._name_cache:
+            return self._name_cache[course_name]
 
-            if results["documents"][0] and results["metadatas"][0]:
-                # Return the title (which is now the ID)
-                return results["metadatas"][0][0]["title"]
+        resolved = None
+        try:
+            # Titles are the catalog IDs, so an exact title skips the embedding
+            if self.course_catalog.get(ids=[course_name], include=[])["ids"]:
+                resolved = course_name
+            else:
+                results = self.course_catalog.query(
+                    query_texts=[course_name], n_results=1
+                )
+
+                if results["documents"][0] and results["metadatas"][0]:
+                    # Return the title (which is now the ID)
+                    resolved = results["metadatas"][0][0]["title"]
         except Exception as e:
+            # Not cached, so a transient failure is retried on the next search
             print(f"Error resolving course name: {e}")
+            return None
 
-        return None
+        # A miss is not cached, so a course added later is still found
+        if resolved:
+            self._name_cache[course_name] = resolved
+        return resolved
 
     def _build_filter(
         self, course_title: Optional[str], lesson_number: Optional[int]
@@ -147,11 +240,26 @@ class VectorStore:
 
         return {"lesson_number": lesson_number}
 
-    def add_course_metadata(self, course: Course):
-        """Add course information to the catalog for semantic search"""
+    def add_course_metadata(self, course: Course) -> bool:
+        """
+        Add course information to the catalog for semantic search.
+
+        A course whose title is already in the catalog is left unchanged,
+        including its links and lessons.
+
+        Returns:
+            True if the course was added, False if it was already stored
+        """
         import json
 
+        # Chroma ignores an add() for an existing ID but only after embedding
+        # the document, so skip duplicates before paying for that
+        if self.course_catalog.get(ids=[course.title], include=[])["ids"]:
+            return False
+
         course_text = course.title
+        self._name_cache.clear()
+        self._course_links.pop(course.title, None)
 
         # Build lessons metadata and serialize as JSON string
         lessons_metadata = []
@@ -179,12 +287,14 @@ class VectorStore:
             ],
             ids=[course.title],
         )
+        return True
 
-    def add_course_content(self, chunks: List[CourseChunk]):
-        """Add course content chunks to the vector store"""
+    def add_course_content(self, chunks: List[CourseChunk], batch_size: int = 200):
+        """Add course content chunks to the vector store, batch_size per add()"""
         if not chunks:
             return
 
+        self._search_cache.clear()
         documents = [chunk.content for chunk in chunks]
         metadatas = [
             {
@@ -200,10 +310,35 @@ class VectorStore:
             for chunk in chunks
         ]
 
-        self.course_content.add(documents=documents, metadatas=metadatas, ids=ids)
+        # One add() per batch keeps each call well under Chroma's max batch
+        # size while still embedding and writing many chunks at a time
+        for start in range(0, len(chunks), batch_size):
+            end = start + batch_size
+            self.course_content.add(
+                documents=documents[start:end],
+                metadatas=metadatas[start:end],
+                ids=ids[start:end],
+            )
+
+    def add_course(self, course: Course, chunks: List[CourseChunk]) -> bool:
+        """
+        Add a course's catalog entry and all of its content chunks in one call.
+
+        Returns:
+            True if the course was added, False if it was already stored
+        """
+        # An already stored course keeps its chunks; re-adding them would
+        # embed every chunk only for Chroma to drop the duplicate IDs
+        if not self.add_course_metadata(course):
+            return False
+        self.add_course_content(chunks)
+        return True
 
     def clear_all_data(self):
         """Clear all data from both collections"""
+        self._name_cache.clear()
+        self._search_cache.clear()
+        self._course_links.clear()
         try:
             self.client.delete_collection("course_catalog")
             self.client.delete_collection("course_content")
@@ -216,8 +351,8 @@ class VectorStore:
     def get_existing_course_titles(self) -> List[str]:
         """Get all existing course titles from the vector store"""
         try:
-            # Get all documents from the catalog
-            results = self.course_catalog.get()
+            # IDs are the titles, so skip loading documents and metadata
+            results = self.course_catalog.get(include=[])
             if results and "ids" in results:
                 return results["ids"]
             return []
@@ -228,10 +363,7 @@ class VectorStore:
     def get_course_count(self) -> int:
         """Get the total number of courses in the vector store"""
         try:
-            results = self.course_catalog.get()
-            if results and "ids" in results:
-                return len(results["ids"])
-            return 0
+            return self.course_catalog.count()
         except Exception as e:
             print(f"Error getting course count: {e}")
             return 0
@@ -241,7 +373,7 @@ class VectorStore:
         import json
 
         try:
-            results = self.course_catalog.get()
+            results = self.course_catalog.get(include=["metadatas"])
             if results and "metadatas" in results:
                 # Parse lessons JSON for each course
                 parsed_metadata = []
@@ -259,36 +391,44 @@ class VectorStore:
             print(f"Error getting courses metadata: {e}")
             return []
 
+    def _get_course_links(self, course_title: str) -> Optional[Dict[str, Any]]:
+        """Course and lesson links for a catalog entry, parsed once per title"""
+        import json
+
+        if course_title in self._course_links:
+            return self._course_links[course_title]
+
+        # Get course by ID (title is the ID)
+        results = self.course_catalog.get(ids=[course_title])
+        if not (results and "metadatas" in results and results["metadatas"]):
+            return None
+
+        metadata = results["metadatas"][0]
+        lessons = json.loads(metadata.get("lessons_json") or "[]")
+        links = {
+            "course_link": metadata.get("course_link"),
+            "lesson_links": {
+                lesson.get("lesson_number"): lesson.get("lesson_link")
+                for lesson in lessons
+            },
+        }
+        self._course_links[course_title] = links
+        return links
+
     def get_course_link(self, course_title: str) -> Optional[str]:
         """Get course link for a given course title"""
         try:
-            # Get course by ID (title is the ID)
-            results = self.course_catalog.get(ids=[course_title])
-            if results and "metadatas" in results and results["metadatas"]:
-                metadata = results["metadatas"][0]
-                return metadata.get("course_link")
-            return None
+            links = self._get_course_links(course_title)
+            return links["course_link"] if links else None
         except Exception as e:
             print(f"Error getting course link: {e}")
             return None
 
     def get_lesson_link(self, course_title: str, lesson_number: int) -> Optional[str]:
         """Get lesson link for a given course title and lesson number"""
-        import json
-
         try:
-            # Get course by ID (title is the ID)
-            results = self.course_catalog.get(ids=[course_title])
-            if results and "metadatas" in results and results["metadatas"]:
-                metadata = results["metadatas"][0]
-                lessons_json = metadata.get("lessons_json")
-                if lessons_json:
-                    lessons = json.loads(lessons_json)
-                    # Find the lesson with matching number
-                    for lesson in lessons:
-                        if lesson.get("lesson_number") == lesson_number:
-                            return lesson.get("lesson_link")
-            return None
+            links = self._get_course_links(course_title)
+            return links["lesson_links"].get(lesson_number) if links else None
         except Exception as e:
             print(f"Error getting lesson link: {e}")
             return None
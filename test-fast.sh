@@ -0,0 +1,9 @@
+#!/bin/bash
+# Run the unit tests in parallel without coverage for a quick local loop
+
+set -e
+
+echo "⚡ Running unit tests..."
+cd backend && uv run pytest -n auto --no-cov -m "unit and not slow"
+
+echo "✅ Unit tests complete!"
@@ -0,0 +1,9 @@
+#!/bin/bash
+# Run only the slow tests that load the real embedding model
+
+set -e
+
+echo "🐢 Running slow tests..."
+cd backend && uv run pytest -m slow
+
+echo "✅ Slow tests complete!"
@@ -1,9 +1,9 @@
 #!/bin/bash
-# Run tests with coverage
+# Run tests with coverage (slow embedding tests are skipped; see test-slow.sh)
 
 set -e
 
 echo "🧪 Running tests with coverage..."
-cd backend && uv run pytest
+cd backend && uv run pytest -n auto
 
 echo "✅ Tests complete! Check htmlcov/index.html for detailed coverage report."